@@ -1,28 +1,115 @@
+import os
 import json
 import time
 import re
-from urllib.parse import urljoin
+import threading
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urljoin, urlparse, urlsplit
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-import textwrap
-from collections import Counter
+from lxml import etree
+import diskcache
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import argparse
+from jsonl_to_json import jsonl_to_json, write_jsonl_record
 
-def get_submissions(conf_name: str,
-                    year: int,
-                    sleep_second: float = 0.1):
+# Fetched pages are cached on disk so re-runs (e.g. after fixing a parser bug) skip the network
+CACHE_DIR = "./.crawl_cache"
+CACHE_EXPIRE = 7 * 86400
+
+# Placeholder titles such as 'NullXYZ' (one word starting with 'Null')
+_NULL_TITLE_RE = re.compile(r"Null\S+")
+
+# List pages are fed to the pull parser in chunks of this many characters
+LIST_CHUNK_SIZE = 1 << 16
+PTITLE_TAGS = {"dt", "div", "h4"}
+
+
+def fast_join(base_parts, href: str) -> str:
+    """
+    urljoin() for the common site-absolute href ('/content/...') without re-parsing
+    the base on every call; base_parts is urlsplit(base), computed once per page.
+    Anything else (relative paths, '//host', absolute URLs) goes through urljoin.
+    """
+    if href.startswith("/") and not href.startswith("//"):
+        return f"{base_parts.scheme}://{base_parts.netloc}{href}"
+    return urljoin(base_parts.geturl(), href)
+
+
+def make_session(user_agent: str, retries: int = 3, backoff: float = 0.1):
+    """
+    Build a requests.Session with a pooled, retrying HTTPS adapter.
+
+    Connections to the same host are kept alive across requests, and transient
+    failures (429/5xx, connection resets) are retried inside urllib3 with
+    exponential backoff, so the TLS handshake is paid once per connection.
+    """
+    sess = requests.Session()
+    retry = Retry(total=retries,
+                  backoff_factor=backoff,
+                  status_forcelist=[429, 500, 502, 503, 504])
+    sess.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry))
+    sess.headers["User-Agent"] = user_agent
+    return sess
+
+
+class HostLimiter:
+    """
+    Per-host politeness shared by all worker threads: at most `max_concurrent`
+    requests in flight and at most `rate_limit` request starts per second for
+    each host, instead of every thread sleeping on its own.
+    """
+
+    def __init__(self, max_concurrent: int = 4, rate_limit: float = 10):
+        self.interval = 1.0 / rate_limit
+        self._lock = threading.Lock()
+        self._sems = defaultdict(lambda: threading.BoundedSemaphore(max_concurrent))
+        self._next_start = defaultdict(float)
+
+    @contextmanager
+    def slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            sem = self._sems[host]
+        with sem:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start[host])
+                self._next_start[host] = start + self.interval
+            time.sleep(start - now)
+            yield
+
+
+HOST_LIMITER = HostLimiter()
+
+
+def iter_submissions(conf_name: str,
+                     year: int,
+                     sleep_second: float = 0.1,
+                     workers: int = 8,
+                     use_cache: bool = True,
+                     skip_urls=(),
+                     fast: bool = False):
     """
-    Fetch CVF Open Access papers (CVPR / ICCV / WACV).
+    Fetch CVF Open Access papers (CVPR / ICCV / WACV), yielding each paper as soon as it is parsed.
 
     Args:
         conf_name: Conference short name, e.g. 'CVPR', 'ICCV', or 'WACV' (case-insensitive).
         year: Four-digit year, e.g. 2024.
         base_url: Root of the CVF Open Access site.
-        sleep_second: polite delay between requests.
+        sleep_second: backoff factor for retried requests (per-host pacing is done by HOST_LIMITER).
+        workers: number of detail pages fetched concurrently.
+        use_cache: reuse pages cached under CACHE_DIR from earlier runs.
+        skip_urls: detail URLs already crawled (e.g. by an interrupted run) that should not be fetched again.
+        fast: take title and authors from the list page and skip the detail pages
+              (abstract and bibtex are then None).
 
-    Returns:
-        List[dict] with keys:
+    Yields:
+        dict with keys:
             - title (str)
             - authors (List[str])
             - abstract (str | None)
@@ -42,84 +129,109 @@ def get_submissions(conf_name: str,
         f"{ROOT}/content/{conf}{year}",        # e.g., /content/CVPR2023
     ]
 
-    def polite_get(url, sess, retries=3, timeout=25):
-        last_exc = None
-        for k in range(retries):
-            try:
-                r = sess.get(
-                    url,
-                    timeout=timeout,
-                    headers={"User-Agent": f"{conf.lower()}-metadata-fetcher/1.0 (respectful; rate-limited)"}
-                )
-                if r.status_code == 200:
-                    return r
-            except Exception as e:
-                last_exc = e
-            time.sleep(sleep_second * (k + 1))
-        if last_exc:
-            raise last_exc
-        raise RuntimeError(f"Failed to GET {url} after {retries} retries")
+    def polite_get(url, sess, cache, timeout=25):
+        # Returns the page text; retries and backoff are handled by the session adapter
+        key = ("GET", url)
+        if cache is not None:
+            text = cache.get(key)
+            if text is not None:
+                return text
+        with HOST_LIMITER.slot(url):
+            r = sess.get(url, timeout=timeout)
+        r.raise_for_status()
+        # CVF pages are UTF-8; setting it skips requests' charset detection on the body
+        r.encoding = "utf-8"
+        if cache is not None:
+            cache.set(key, r.text, expire=CACHE_EXPIRE)
+        return r.text
 
     def parse_list_titles(html):
-        soup = BeautifulSoup(html, "html.parser")
-        items = []
-        # Standard listing blocks across many CVF years:
-        # dt/div/h4.ptitle > a[href]
-        for node in soup.select("dt.ptitle a, div.ptitle a, h4.ptitle a"):
-            href = node.get("href")
-            title = node.get_text(strip=True)
-            if not href or not title:
-                continue
-            items.append({"title": title, "detail_url": urljoin(ROOT, href)})
-
-        # Fallback: some "content" pages link to /html/... entries directly
-        if not items:
-            for a in soup.select("a[href*='/html/']"):
-                title = a.get_text(strip=True)
-                href = a.get("href")
-                if title and href:
-                    items.append({"title": title, "detail_url": urljoin(ROOT, href)})
-        return items
+        # Stream the list page through a pull parser and drop finished subtrees,
+        # so the DOM of a ~2500-entry page is never materialized at once
+        parser = etree.HTMLPullParser(events=("end",))
+        root_parts = urlsplit(ROOT)
+        items, fallback = [], []
+        for i in range(0, len(html), LIST_CHUNK_SIZE):
+            parser.feed(html[i:i + LIST_CHUNK_SIZE])
+            for _, elem in parser.read_events():
+                if elem.tag == "a":
+                    href = elem.get("href")
+                    title = "".join(elem.itertext()).strip()
+                    if href and title:
+                        entry = {"title": title, "detail_url": fast_join(root_parts, href), "authors": []}
+                        # Standard listing blocks across many CVF years:
+                        # dt/div/h4.ptitle > a[href]
+                        if any(p.tag in PTITLE_TAGS and "ptitle" in (p.get("class") or "").split()
+                               for p in elem.iterancestors()):
+                            items.append(entry)
+                        # Fallback: some "content" pages link to /html/... entries directly
+                        elif "/html/" in href:
+                            fallback.append(entry)
+                # Authors follow their title as author-search forms:
+                # <form class="authsearch"><input name="query_author" value="...">
+                elif elem.tag == "input" and elem.get("name") == "query_author" and items:
+                    name = (elem.get("value") or "").strip()
+                    if name:
+                        items[-1]["authors"].append(name)
+                # Children of a link (<a>Alpha <i>Beta</i> Gamma</a>) are kept until the <a> itself
+                # ends, since its title is read from their text; the <a> is cleared after that
+                if next(elem.iterancestors("a"), None) is not None:
+                    continue
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+        parser.close()
+        return items or fallback
 
     def parse_detail(html, detail_url):
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
+
+        # Collect every node we need in a single walk over the tree
+        # instead of re-traversing the DOM once per selector
+        tnode = authors_div = abnode = bib = bib_anchor = None
+        for el in soup.find_all(True):
+            el_id = el.get("id")
+            if el_id == "papertitle":
+                tnode = tnode or el
+            elif el_id == "authors":
+                authors_div = authors_div or el
+            elif el_id == "abstract":
+                abnode = abnode or el
+            elif el.name == "div" and "bibref" in el.get("class", ()):
+                bib = bib or el
+            elif el.name == "a" and bib_anchor is None and el.get("href"):
+                if "bibtex" in el["href"].lower() or "bibtex" in el.get_text().lower():
+                    bib_anchor = el
 
         # Title (prefer detail page if present)
         title = None
-        tnode = soup.select_one("#papertitle")
         if tnode:
             title = tnode.get_text(" ", strip=True)
 
         # Authors: <div id="authors"><i>Author1, Author2, ...</i></div>
         authors = []
-        anode = soup.select_one("#authors i")
+        anode = authors_div.find("i") if authors_div else None
         if anode:
-            authors = [x.strip() for x in anode.get_text(" ", strip=True).split(",") if x.strip()]
+            for name in anode.get_text(" ", strip=True).split(","):
+                name = name.strip()
+                if name:
+                    authors.append(name)
 
         # Abstract: <div id="abstract"> ... </div>
         abstract = None
-        abnode = soup.select_one("#abstract")
         if abnode:
             abstract = abnode.get_text(" ", strip=True)
 
         # BibTeX: typically <div class="bibref"><pre> ... </pre>
         bibtex = None
-        pre = soup.select_one("div.bibref pre")
-        if pre:
-            bibtex = pre.get_text().strip()
-        else:
-            bib = soup.select_one("div.bibref")
-            if bib:
-                bibtex = bib.get_text().strip()
+        if bib:
+            pre = bib.find("pre")
+            bibtex = (pre or bib).get_text().strip()
 
         # BibTeX URL (if a link references bibtex)
         bibtex_url = None
-        for a in soup.find_all("a", href=True):
-            href_l = a["href"].lower()
-            txt_l = (a.get_text() or "").lower()
-            if "bibtex" in href_l or "bibtex" in txt_l:
-                bibtex_url = urljoin(detail_url, a["href"])
-                break
+        if bib_anchor:
+            bibtex_url = urljoin(detail_url, bib_anchor["href"])
 
         return {
             "title": title,
@@ -129,99 +241,157 @@ def get_submissions(conf_name: str,
             "bibtex_url": bibtex_url
         }
 
-    results = []
-    seen_detail_urls = set()
+    count, next_milestone = 0, 100
+    seen_detail_urls = set(skip_urls)
 
-    with requests.Session() as sess:
+    user_agent = f"{conf.lower()}-metadata-fetcher/1.0 (respectful; rate-limited)"
+    with make_session(user_agent, backoff=sleep_second) as sess, \
+            (diskcache.Cache(CACHE_DIR) if use_cache else nullcontext()) as cache:
         # Step 1: gather (title, detail_url) entries from a list page
         entries = []
         for u in list_urls:
             try:
-                r = polite_get(u, sess)
-                entries = parse_list_titles(r.text)
+                entries = parse_list_titles(polite_get(u, sess, cache))
                 if entries:
                     break
             except Exception:
                 continue
 
         if not entries:
-            return []
+            return
 
-        # Step 2: visit each detail page for full metadata
+        # Deduplicate if the list page has repeated links
+        unique_entries = []
         for e in entries:
-            # Deduplicate if the list page has repeated links
-            detail_url = e["detail_url"]
-            if detail_url in seen_detail_urls:
+            if e["detail_url"] in seen_detail_urls:
                 continue
-            seen_detail_urls.add(detail_url)
+            seen_detail_urls.add(e["detail_url"])
+            # In fast mode the list page's title + authors are enough; abstract/bibtex need the detail page
+            e["need_detail"] = not (fast and e["authors"])
+            unique_entries.append(e)
 
-            title_from_list = e["title"]
-            try:
-                time.sleep(sleep_second)
-                rd = polite_get(detail_url, sess)
-                rec = parse_detail(rd.text, detail_url)
-            except Exception:
-                rec = {"title": None, "authors": [], "abstract": None, "bibtex": None, "bibtex_url": None}
+        def fetch_detail(e):
+            detail_url = e["detail_url"]
+            rec = {"title": None, "authors": e["authors"], "abstract": None, "bibtex": None, "bibtex_url": None}
+            if e["need_detail"]:
+                try:
+                    rec = parse_detail(polite_get(detail_url, sess, cache), detail_url)
+                except Exception:
+                    pass
 
             # Prefer detail title; fallback to list title
-            rec["title"] = rec["title"] or title_from_list
+            rec["title"] = rec["title"] or e["title"]
             rec["detail_url"] = detail_url
             rec["conference"] = conf
             rec["year"] = year
-            results.append(rec)
-            if len(results) % 100 == 0:
-                print (f'Get {len(results)} papers from {conf_name} {year}')
+            return rec
+
+        # Step 2: visit the detail pages concurrently (map() keeps list order)
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            for rec in ex.map(fetch_detail, unique_entries):
+                yield rec
+                count += 1
+                if count >= next_milestone:
+                    print (f'Get {count} papers from {conf_name} {year}')
+                    next_milestone += 100
 
-    return results
+
+def get_submissions(conf_name: str, year: int, **kwargs):
+    """List version of iter_submissions; holds every record in memory."""
+    return list(iter_submissions(conf_name, year, **kwargs))
+
+
+def load_crawled_links(jsonl_path):
+    """
+    Return the 'link' of every complete record in a partial JSONL output,
+    dropping a trailing line that was cut off by an interrupted run.
+    """
+    links = set()
+    with open(jsonl_path, "r+b") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        try:
+            links.add(json.loads(line)["link"])
+        except (ValueError, KeyError):
+            continue
+    return links
 
 
 def main(args):
 
-    notes = get_submissions(args.conf_name, args.year)
-    
+    done_links = set()
+    if args.resume:
+        # Continue an interrupted crawl: append to its JSONL file and skip papers already in it
+        jsonl_path = args.resume
+        # Only a .jsonl is safe here: it gets truncated, appended to and finally replaced by its .json
+        if not jsonl_path.endswith(".jsonl"):
+            raise ValueError(f"--resume expects the .jsonl file of an interrupted crawl, got: {jsonl_path}")
+        filename = os.path.splitext(jsonl_path)[0] + ".json"
+        done_links = load_crawled_links(jsonl_path)
+        print(f"Resuming {jsonl_path}: {len(done_links)} papers already crawled")
+    else:
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S") # They update the submission list, so timestamps are added
+        filename = f"notes_{args.conf_name}{args.year}_{timestamp}.json"
+        # Records are streamed to a JSON Lines file as they arrive, so memory stays flat
+        # and a crash keeps everything fetched so far
+        jsonl_path = filename + "l"
+
+    total = 0
+    key_counter = Counter()
+    with open(jsonl_path, "ab" if args.resume else "wb") as out:
+        for note in iter_submissions(args.conf_name, args.year, workers=args.workers,
+                                     use_cache=not args.no_cache, skip_urls=done_links,
+                                     fast=args.fast):
+            total += 1
+            key_counter.update(note.keys())
+
+            # Extract title value safely
+            title_val = note.get("title", "")
+            if isinstance(title_val, dict) and "value" in title_val:
+                title_val = title_val["value"]
+            # Skip notes where title starts with 'Null' followed by any non-space chars (one word)
+            if isinstance(title_val, str) and _NULL_TITLE_RE.fullmatch(title_val):
+                continue
+            entry = {}
+            for key, value in note.items():
+                # Safely extract inner value if present
+                if isinstance(value, dict) and "value" in value:
+                    val = str(value["value"])
+                else:
+                    val = str(value)
+                if key == 'bibtex':
+                    entry['_bibtex'] = val
+                elif key == 'detail_url':
+                    entry['link'] = val
+                else: entry[key] = val
+            write_jsonl_record(entry, out)
+
     # Check how many submissions there are
-    print(f"Total submissions: {len(notes)}")
+    print(f"Total submissions: {total}")
     # Get all the possible atrributes
-
-    key_counter = Counter(k for note in notes for k in note.keys())
     print("\nAttribute occurrence counts:")
     for key, count in key_counter.items():
         print(f"{key}: {count}")
 
-    json_data = []
-    for note in notes:
-        # Extract title value safely
-        title_val = note.get("title", "")
-        if isinstance(title_val, dict) and "value" in title_val:
-            title_val = title_val["value"]
-        # Skip notes where title starts with 'Null' followed by any non-space chars (one word)
-        if isinstance(title_val, str) and re.fullmatch(r"Null\S+", title_val):
-            continue
-        entry = {}
-        for key, value in note.items():
-            # Safely extract inner value if present
-            if isinstance(value, dict) and "value" in value:
-                val = str(value["value"])
-            else:
-                val = str(value)
-            if key == 'bibtex':
-                entry['_bibtex'] = val
-            elif key == 'detail_url':
-                entry['link'] = val
-            else: entry[key] = val
-        json_data.append(entry)
-
-    # Save to JSON file
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S") # They update the submission list, so timestamps are added
-    filename = f"notes_{args.conf_name}{args.year}_{timestamp}.json"
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(json_data, f, ensure_ascii=False, indent=2)
+    # Save to JSON file (or keep the JSON Lines file as the final output)
+    if args.out_format == 'json':
+        jsonl_to_json(jsonl_path, filename)
+        os.remove(jsonl_path)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Openreview-based')
     parser.add_argument('--conf_name', type=str, help='Conference Name: CVPR, ICCV')
     parser.add_argument('--year', type=str, help='corresponding year')
+    parser.add_argument('--workers', type=int, default=8, help='number of concurrent detail-page requests')
+    parser.add_argument('--no_cache', action='store_true', help='disable the on-disk page cache')
+    parser.add_argument('--fast', action='store_true', help='only title and authors from the list page (no abstract/bibtex)')
+    parser.add_argument('--out_format', type=str, default='json', choices=['json', 'jsonl'],
+                        help='json: one JSON array (default); jsonl: keep one record per line')
+    parser.add_argument('--resume', type=str, default=None, help='.jsonl file left by an interrupted run to continue')
     args = parser.parse_args()
 
     main(args)
@@ -1,11 +1,21 @@
 import openreview
 from openreview import tools
-import json
+import os
 import re
-import textwrap
 from collections import Counter
 from datetime import datetime
 import argparse
+import functools
+from jsonl_to_json import jsonl_to_json, write_jsonl_record
+
+# Placeholder titles such as 'NullXYZ' (one word starting with 'Null')
+_NULL_TITLE_RE = re.compile(r"Null\S+")
+
+@functools.lru_cache(maxsize=None)
+def get_client(client_cls, baseurl, username, password):
+    """Log in once per (API, account) and reuse the client across venues and retries."""
+    return client_cls(baseurl=baseurl, username=username, password=password)
+
 
 def get_submissions(conf_name: str, year: int, email: str = None, 
                     password: str = None, state: str = 'Submitted'):
@@ -23,23 +33,19 @@ def get_submissions(conf_name: str, year: int, email: str = None,
     """
     prefix = f"{conf_name}.cc"
     venue = f"{prefix}/{year}/Conference"
+    # Filter while iterating the paginated generator so unwanted notes are never accumulated
+    accepted_only = state == 'Accepted' and conf_name == 'ICLR'
 
     # --- Try API v2 (used for 2023+ venues like ICLR 2024, 2025, etc.) ---
     try:
-        client_v2 = openreview.api.OpenReviewClient(
-            baseurl="https://api2.openreview.net",
-            username=email,
-            password=password,
-        )
+        client_v2 = get_client(openreview.api.OpenReviewClient, "https://api2.openreview.net",
+                               email, password)
         v2_inv = f"{venue}/-/Submission"
-        notes = list(tools.iterget_notes(client_v2, invitation=v2_inv))
-        if state == 'Accepted' and conf_name == 'ICLR':
-            filtered = []
-            for n in notes:
-                venue_str = n.content.get("venue", "")
-                if venue_str['value'].find('Submi') < 0:
-                    filtered.append(n)
-            notes = filtered
+        notes = []
+        for n in tools.iterget_notes(client_v2, invitation=v2_inv):
+            if accepted_only and n.content.get("venue", {}).get("value", "").find('Submi') >= 0:
+                continue
+            notes.append(n)
         if notes:
             print(f"Found {len(notes)} submissions via API v2 ({v2_inv})")
             return notes
@@ -48,11 +54,7 @@ def get_submissions(conf_name: str, year: int, email: str = None,
 
     # --- Fallback: API v1 (used for ≤2022 or some 2023 venues) ---
     try:
-        client_v1 = openreview.Client(
-            baseurl="https://api.openreview.net",
-            username=email,
-            password=password,
-        )
+        client_v1 = get_client(openreview.Client, "https://api.openreview.net", email, password)
 
         possible_invitations = [
             f"{venue}/-/Blind_Submission",                # common for ICLR/NeurIPS/ICML ≤2022
@@ -61,14 +63,11 @@ def get_submissions(conf_name: str, year: int, email: str = None,
 
         for inv in possible_invitations:
             try:
-                notes = list(tools.iterget_notes(client_v1, invitation=inv))
-                if state == 'Accepted' and conf_name == 'ICLR':
-                    filtered = []
-                    for n in notes:
-                        venue_str = n.content.get("venue", "")
-                        if venue_str.find('Submi') < 0:
-                            filtered.append(n)
-                    notes = filtered
+                notes = []
+                for n in tools.iterget_notes(client_v1, invitation=inv):
+                    if accepted_only and n.content.get("venue", "").find('Submi') >= 0:
+                        continue
+                    notes.append(n)
                 if notes:
                     print(f"Found {len(notes)} submissions via API v1 ({inv})")
                     return notes
@@ -86,45 +85,52 @@ def main(args):
     notes = get_submissions(args.conf_name, args.year, args.email, 
                             args.password, args.state)
     
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S") # They update the submission list, so timestamps are added
+    filename = f"notes_{args.conf_name}{args.year}_{args.state}_{timestamp}.json"
+    # Entries are written one per line as they are built instead of being collected in a list
+    jsonl_path = filename + "l"
+
+    # Count attributes and write the JSON entries in a single pass over the notes
+    key_counter = Counter()
+    with open(jsonl_path, "wb") as out:
+        for note in notes:
+            key_counter.update(note.content.keys())
+
+            # Extract title value safely
+            title_val = note.content.get("title", "")
+            if isinstance(title_val, dict) and "value" in title_val:
+                title_val = title_val["value"]
+            # Skip notes where title starts with 'Null' followed by any non-space chars (one word)
+            if isinstance(title_val, str) and _NULL_TITLE_RE.fullmatch(title_val):
+                continue
+            entry = {}
+            for key, value in note.content.items():
+                # Safely extract inner value if present
+                if isinstance(value, dict) and "value" in value:
+                    val = str(value["value"])
+                else:
+                    val = str(value)
+                # Special handling for 'pdf' field
+                if key == "pdf":
+                    # Prepend if it's not already a full URL
+                    if val and not val.startswith("https://openreview.net/"):
+                        val = "https://openreview.net/" + val.lstrip("/")
+                    entry['link'] = val
+                else:
+                    entry[key] = val
+            write_jsonl_record(entry, out)
+
     # Check how many submissions there are
     print(f"Total submissions: {len(notes)}")
     # Get all the possible atrributes
-    key_counter = Counter(k for note in notes for k in note.content.keys())
     print("\nAttribute occurrence counts:")
     for key, count in key_counter.items():
         print(f"  {key}: {count}")
 
-    json_data = []
-    for note in notes:
-        # Extract title value safely
-        title_val = note.content.get("title", "")
-        if isinstance(title_val, dict) and "value" in title_val:
-            title_val = title_val["value"]
-        # Skip notes where title starts with 'Null' followed by any non-space chars (one word)
-        if isinstance(title_val, str) and re.fullmatch(r"Null\S+", title_val):
-            continue
-        entry = {}
-        for key, value in note.content.items():
-            # Safely extract inner value if present
-            if isinstance(value, dict) and "value" in value:
-                val = str(value["value"])
-            else:
-                val = str(value)
-            # Special handling for 'pdf' field
-            if key == "pdf":
-                # Prepend if it's not already a full URL
-                if val and not val.startswith("https://openreview.net/"):
-                    val = "https://openreview.net/" + val.lstrip("/")
-                entry['link'] = val
-            else:
-                entry[key] = val
-        json_data.append(entry)
-
-    # Save to JSON file
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S") # They update the submission list, so timestamps are added
-    filename = f"notes_{args.conf_name}{args.year}_{args.state}_{timestamp}.json"
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(json_data, f, ensure_ascii=False, indent=2)
+    # Save to JSON file (or keep the JSON Lines file as the final output)
+    if args.out_format == 'json':
+        jsonl_to_json(jsonl_path, filename)
+        os.remove(jsonl_path)
 
 
 if __name__ == "__main__":
@@ -134,6 +140,8 @@ if __name__ == "__main__":
     parser.add_argument('--conf_name', type=str, help='Conference Name: ICML, ICLR, NeurIPS')
     parser.add_argument('--year', type=str, help='corresponding year')
     parser.add_argument('--state', type=str, help='State of paper: Accepted/Submission')
+    parser.add_argument('--out_format', type=str, default='json', choices=['json', 'jsonl'],
+                        help='json: one JSON array (default); jsonl: keep one record per line')
     
     args = parser.parse_args()
 
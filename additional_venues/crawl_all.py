@@ -0,0 +1,55 @@
+import argparse
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import CVPR_ICCV
+
+
+def crawl_all(year, cvf_confs=(), openreview_confs=(), email=None, password=None,
+              state='Submitted', workers=8):
+    """
+    Run several venue crawls for one year at the same time.
+
+    Each venue is crawled by its own script's main() in a separate thread. The CVF
+    and OpenReview crawls hit different hosts, so their network waits overlap. CVF
+    venues share CVPR_ICCV.HOST_LIMITER, so running them together does not
+    raise the load on openaccess.thecvf.com.
+    """
+    jobs = []
+    for conf in cvf_confs:
+        jobs.append((CVPR_ICCV.main, Namespace(conf_name=conf, year=str(year), workers=workers,
+                                               no_cache=False, resume=None, fast=False,
+                                               out_format='json')))
+    if openreview_confs:
+        # Imported only when needed: it pulls in the openreview client, which CVF-only runs do not need
+        import ICML_ICLR_NeurIPS
+    for conf in openreview_confs:
+        jobs.append((ICML_ICLR_NeurIPS.main, Namespace(conf_name=conf, year=str(year), email=email,
+                                                       password=password, state=state,
+                                                       out_format='json')))
+    if not jobs:
+        return
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as ex:
+        futures = {ex.submit(fn, job_args): job_args.conf_name for fn, job_args in jobs}
+        for fut in as_completed(futures):
+            conf = futures[fut]
+            try:
+                fut.result()
+                print(f"Finished {conf} {year}")
+            except Exception as e:
+                print(f"[{conf} {year}] Failed: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Crawl several venues of one year concurrently')
+    parser.add_argument('--year', type=str, help='corresponding year')
+    parser.add_argument('--cvf', nargs='*', default=[], help='CVF conferences: CVPR, ICCV, WACV')
+    parser.add_argument('--openreview', nargs='*', default=[], help='OpenReview conferences: ICML, ICLR, NeurIPS')
+    parser.add_argument('--email', type=str, help='Email of your openreview profile')
+    parser.add_argument('--password', type=str, help='password of your openreview profile')
+    parser.add_argument('--state', type=str, default='Submitted', help='State of paper: Accepted/Submission')
+    parser.add_argument('--workers', type=int, default=8, help='number of concurrent detail-page requests per CVF crawl')
+    args = parser.parse_args()
+
+    crawl_all(args.year, args.cvf, args.openreview, args.email, args.password, args.state, args.workers)
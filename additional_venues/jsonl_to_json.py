@@ -0,0 +1,49 @@
+import argparse
+import json
+
+try:
+    import orjson  # optional: much faster than json.dumps for large record lists
+except ImportError:
+    orjson = None
+
+
+def write_jsonl_record(rec, f):
+    """Append one record as a JSON line to a binary file and flush it to disk."""
+    if orjson is not None:
+        f.write(orjson.dumps(rec))
+    else:
+        f.write(json.dumps(rec, ensure_ascii=False).encode("utf-8"))
+    f.write(b"\n")
+    f.flush()
+
+
+def jsonl_to_json(jsonl_path, json_path):
+    """
+    Convert a JSON Lines file (one record per line) into a JSON array file.
+
+    Lines are copied through one at a time, so the records never have to be
+    loaded into memory together. A last line without its newline was cut off
+    by an interrupted run and is dropped, the same rule load_crawled_links uses.
+    """
+    with open(jsonl_path, "rb") as src, open(json_path, "wb") as dst:
+        dst.write(b"[")
+        first = True
+        for line in src:
+            if not line.endswith(b"\n"):
+                break
+            line = line.strip()
+            if not line:
+                continue
+            dst.write(b"\n  " if first else b",\n  ")
+            dst.write(line)
+            first = False
+        dst.write(b"\n]\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert crawler JSONL output into a JSON array')
+    parser.add_argument('jsonl_path', type=str, help='input .jsonl file')
+    parser.add_argument('json_path', type=str, help='output .json file')
+    args = parser.parse_args()
+
+    jsonl_to_json(args.jsonl_path, args.json_path)
@@ -1,25 +1,89 @@
 import chromadb
-import chromadb.utils.embedding_functions as embedding_functions
+from chromadb.config import Settings
 from chromadb.utils import embedding_functions as ef
 import gradio as gr
 import markdown
 import ast
-from sentence_transformers import SentenceTransformer
+import json
+import functools
+import numpy as np
+
+
+@functools.lru_cache(maxsize=None)
+def get_client(path: str):
+    # One client per store for the whole process (reloads reuse it); telemetry off skips its startup HTTP call
+    return chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
+
+
+client = get_client("data/ICLR2026")
+COLLECTION_NAMES = {"gemini-embedding-001": "Gemini", "all-MiniLM-L6-v2": "MiniLM"}
 
 
-client = chromadb.PersistentClient(path="data/ICLR2026")
-_ = SentenceTransformer("all-MiniLM-L6-v2")
 # --- dynamic embedding selector ---
-def get_collection(model_name: str, api_key: str):
+@functools.lru_cache(maxsize=4)
+def _local_embedding_function(model_name: str):
+    # Loads the model weights once per process instead of on every search
+    return ef.SentenceTransformerEmbeddingFunction(model_name=model_name)
+
+
+def get_embedding_function(model_name: str, api_key: str):
+    if model_name == "gemini-embedding-001":
+        # Bound to the caller's API key, so it is not shared across searches
+        return ef.GoogleGenerativeAiEmbeddingFunction(api_key=api_key)
+    elif model_name == "all-MiniLM-L6-v2":
+        return _local_embedding_function(model_name)
+    else:
+        raise ValueError(f"Unknown model: {model_name}")
+
+
+@functools.lru_cache(maxsize=4)
+def _local_collection(model_name: str):
+    return client.get_collection(name=COLLECTION_NAMES[model_name],
+                                 embedding_function=_local_embedding_function(model_name))
+
+
+def get_collection(model_name: str, embedding_function):
     if model_name == "gemini-embedding-001":
-        embedding_fn = ef.GoogleGenerativeAiEmbeddingFunction(api_key=api_key)
-        COLLECTION_NAME = "Gemini"
+        return client.get_collection(name=COLLECTION_NAMES[model_name],
+                                     embedding_function=embedding_function)
     elif model_name == "all-MiniLM-L6-v2":
-        embedding_fn = ef.SentenceTransformerEmbeddingFunction(model_name="all-MiniLM-L6-v2")
-        COLLECTION_NAME = "MiniLM"
+        return _local_collection(model_name)
     else:
         raise ValueError(f"Unknown model: {model_name}")
-    return client.get_collection(name=COLLECTION_NAME, embedding_function=embedding_fn)
+
+
+@functools.lru_cache(maxsize=256)
+def _embed_local(model_name: str, query_text: str):
+    return _local_embedding_function(model_name)([query_text])[0]
+
+
+def embed_query(model_name: str, embedding_function, query_text: str):
+    # Embed once here and query Chroma by vector; repeated local-model queries are served from the cache
+    if model_name == "gemini-embedding-001":
+        return embedding_function([query_text])[0]
+    return _embed_local(model_name, query_text)
+
+
+# Load the default model at startup so the first search does not pay for it
+_local_embedding_function("all-MiniLM-L6-v2")
+
+
+def parse_keywords(keywords_raw):
+    if isinstance(keywords_raw, list):
+        return keywords_raw
+    if isinstance(keywords_raw, str) and keywords_raw.strip().startswith("["):
+        # json.loads is much cheaper than literal_eval (no AST compile) and fails fast on
+        # single-quoted Python reprs, which then take the literal_eval path
+        try:
+            keywords = json.loads(keywords_raw)
+        except ValueError:
+            try:
+                keywords = ast.literal_eval(keywords_raw)
+            except Exception:
+                keywords = None
+        if isinstance(keywords, list):
+            return keywords
+    return [str(keywords_raw)]
 
 
 def query_db(model_name, api_key, query_text, total_results=50):
@@ -29,36 +93,40 @@ def query_db(model_name, api_key, query_text, total_results=50):
         return None, "Please enter your Gemini API key."
 
     try:
-        collection = get_collection(model_name, api_key)
-        results = collection.query(query_texts=[query_text], n_results=int(total_results))
+        # Built once per search and shared, so the Gemini client is configured with the key only once
+        embedding_function = get_embedding_function(model_name, api_key)
+        collection = get_collection(model_name, embedding_function)
+        query_embedding = embed_query(model_name, embedding_function, query_text)
+        # Only fetch what the result cards render (no embeddings/uris)
+        results = collection.query(query_embeddings=[query_embedding], n_results=int(total_results),
+                                   include=["documents", "metadatas", "distances"])
         docs = results["documents"][0]
         metas = results["metadatas"][0]
         ids = results["ids"][0]
-        dists = results["distances"][0]
+        dists = np.asarray(results["distances"][0], dtype=float)
+        similarities = np.where(dists <= 1, 1 - dists, dists).round(4).tolist()
 
         records = []
-        for doc_id, doc, meta, dist in zip(ids, docs, metas, dists):
+        for doc_id, doc, meta, similarity in zip(ids, docs, metas, similarities):
             title = meta.get("title", "Untitled")
             keywords_raw = meta.get("keywords", "")
             pdf = meta.get("pdf", "")
             bibtex = meta.get("_bibtex", "")
-            similarity = round(1 - dist, 4) if dist <= 1 else round(dist, 4)
 
-            try:
-                if isinstance(keywords_raw, str) and keywords_raw.strip().startswith("["):
-                    keywords = ast.literal_eval(keywords_raw)
-                elif isinstance(keywords_raw, list):
-                    keywords = keywords_raw
-                else:
-                    keywords = [str(keywords_raw)]
-            except Exception:
-                keywords = [str(keywords_raw)]
+            keywords = parse_keywords(keywords_raw)
 
+            # Render the HTML once per search; pagination only slices the rendered records
+            abstract_md = doc.strip()
             records.append({
                 "title": title,
                 "keywords": keywords,
                 "pdf": pdf,
-                "abstract_md": doc.strip(),
+                "abstract_md": abstract_md,
+                "abstract_html": markdown.markdown(abstract_md, extensions=["fenced_code", "tables"]),
+                "keyword_html": " ".join(
+                    f"<span class='keyword'>{k.strip().title()}</span>"
+                    for k in keywords if k and isinstance(k, str)
+                ),
                 "bibtex": bibtex,
                 "similarity": similarity
             })
@@ -75,19 +143,14 @@ def render_page(records, page, per_page=10):
     start, end = (page - 1) * per_page, min(page * per_page, len(records))
     html = ""
     for r in records[start:end]:
-        abstract_html = markdown.markdown(r["abstract_md"], extensions=["fenced_code", "tables"])
-        keyword_html = " ".join([
-            f"<span class='keyword'>{k.strip().title()}</span>"
-            for k in r["keywords"] if k and isinstance(k, str)
-        ])
         html += f"""
         <div class='paper-card'>
             <h3>{r['title']}</h3>
             <p><b>Affinity Score:</b> {r['similarity']}</p>
-            <p><b>Keywords:</b> {keyword_html}</p>
+            <p><b>Keywords:</b> {r['keyword_html']}</p>
             <p><b>PDF:</b> <a href='{r['pdf']}' target='_blank'>{r['pdf']}</a></p>
             <details><summary>Show Abstract</summary>
-              <div class='abstract markdown-body'>{abstract_html}</div>
+              <div class='abstract markdown-body'>{r['abstract_html']}</div>
             </details>
             <details><summary>Show BibTeX</summary>
               <div class='bibtex'><pre>{r['bibtex']}</pre></div>
@@ -1,57 +1,160 @@
 import os 
 import re
+import argparse
+import functools
+import mmap
+import string
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 
 # === Configuration ===
-input_file = "ai-paper-finder.info search results.txt"  # Path to your text file
-save_dir = "pdf_downloads"  # Folder to save PDFs
+parser = argparse.ArgumentParser(description="Batch-download the PDFs listed in exported search results.")
+parser.add_argument("--input", default="ai-paper-finder.info search results.txt", help="Path to your text file")
+parser.add_argument("--save_dir", default="pdf_downloads", help="Folder to save PDFs")
+parser.add_argument("--workers", type=int, default=8, help="Number of PDFs downloaded in parallel")
+parser.add_argument("--yes", action="store_true", help="Download without asking first (for unattended runs)")
+args = parser.parse_args()
+
+input_file = args.input
+save_dir = args.save_dir
+max_workers = args.workers
 os.makedirs(save_dir, exist_ok=True)
 
-# === Read file ===
-with open(input_file, "r", encoding="utf-8") as f:
-    text = f.read()
+# One pooled session shared by all workers: consecutive PDFs from the same host
+# (arxiv.org, openreview.net, ...) reuse kept-alive connections instead of a new TLS handshake each
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                       max_retries=Retry(total=3, backoff_factor=0.5))
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+SESSION.headers.update({
+    "User-Agent": "ai-paper-finder-batch-download/1.0",
+    "Connection": "keep-alive",  # explicit, so no proxy in between downgrades to one request per connection
+    "Accept": "application/pdf,*/*;q=0.8",
+})
+
+# Patterns compiled once up front. FIELD_RE holds all four fields plus the line of dashes between
+# entries in one alternation, so the whole file is scanned once whatever order the fields come in
+FIELD_RE = re.compile(
+    rb"(?P<sep>-{5,})"
+    rb"|Title:\s*(?P<title>.*)"
+    rb"|Venue:\s*(?P<venue>.*)"
+    rb"|Link:\s*(?P<link>https?://\S+\.pdf)"
+    rb"|Affinity Score:\s*(?P<affinity>[\d.]+)"
+)
+
+# Filename sanitizing: str.translate deletes every character outside [a-zA-Z0-9_\- ] in one C-level pass.
+# The table fills itself in lazily with the characters actually seen instead of covering all of Unicode
+_SAFE_CHARS = frozenset(map(ord, string.ascii_letters + string.digits + "_- "))
+
+class _SafeTable(dict):
+    def __missing__(self, c):
+        self[c] = c if c in _SAFE_CHARS else None
+        return self[c]
 
-# === Split into entries by the line of dashes (or other separator) ===
-entries = re.split(r"-{5,}", text)
+SAFE_TABLE = _SafeTable()
 
+
+@functools.lru_cache(maxsize=1024)
+def safe_name(s):
+    # Cached: the same few venue strings repeat across a whole results file
+    return s.translate(SAFE_TABLE)
+
+# === Map file ===
+# The pattern scans the raw bytes in place; only the captured fields are decoded
+with open(input_file, "rb") as f:
+    text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+# === Walk the fields entry by entry; a line of dashes (or other separator) closes an entry ===
 papers = []
-for entry in entries:
-    title_match = re.search(r"Title:\s*(.*)", entry)
-    venue_match = re.search(r"Venue:\s*(.*)", entry)
-    link_match = re.search(r"Link:\s*(https?://\S+\.pdf)", entry)
-    affinity_match = re.search(r"Affinity Score:\s*([\d.]+)", entry)
-
-    if title_match and venue_match and link_match and affinity_match:
-        title = title_match.group(1).strip()
-        venue = venue_match.group(1).strip()
-        link = link_match.group(1).strip()
-        affinity = float(affinity_match.group(1))
+
+def add_paper(fields):
+    if len(fields) == 4:
+        title = fields["title"].decode("utf-8").strip()
+        venue = fields["venue"].decode("utf-8").strip()
+        link = fields["link"].decode("utf-8").strip()
+        affinity = float(fields["affinity"])
         papers.append((title, venue, link, affinity))
 
+fields = {}
+for m in FIELD_RE.finditer(text):
+    if m.lastgroup == "sep":
+        add_paper(fields)
+        fields = {}
+    else:
+        fields.setdefault(m.lastgroup, m.group(m.lastgroup))  # keep the first occurrence of each field
+add_paper(fields)
+
 print(f"Found {len(papers)} papers with PDF links.")
 
+# === Build every (index, link, filename, filepath) job up front, so workers only do network and disk I/O ===
+# Filenames: "<index> - <affinity rounded to 2 decimals> - <venue> - <title>.pdf" with illegal characters removed
+jobs = []
+for i, (title, venue, link, affinity) in enumerate(papers, 1):
+    filename = f"{i:02d} - {affinity:.2f} - {safe_name(venue)} - {safe_name(title)}.pdf"
+    jobs.append((i, link, filename, os.path.join(save_dir, filename)))
+
+
+# === Download one paper ===
+def download(i, link, filename, filepath):
+    # Skip papers finished by an earlier run, so re-running after a crash only fetches what is missing
+    if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+        print(f"[{i}/{len(papers)}] Already downloaded {filename}")
+        return
+
+    # Write to a temporary name so an interrupted download is never mistaken for a finished one
+    partpath = filepath + ".part"
+    # An interrupted run leaves a .part behind; ask the server only for the bytes still missing.
+    # Byte offsets only line up with the .part if the body is not content-encoded, hence identity
+    have = os.path.getsize(partpath) if os.path.exists(partpath) else 0
+    headers = {"Range": f"bytes={have}-", "Accept-Encoding": "identity"} if have else {}
+
+    try:
+        print(f"[{i}/{len(papers)}] Downloading {filename} ...")
+        restart = False
+        with SESSION.get(link, stream=True, timeout=30, headers=headers) as response:
+            content_range = response.headers.get("Content-Range", "")
+            if have and response.status_code == 416:
+                # Range past the end: the .part is complete only if it matches the server's total size
+                restart = content_range != f"bytes */{have}"
+            else:
+                response.raise_for_status()
+                # A 206 that does not resume exactly at our offset cannot be appended
+                restart = response.status_code == 206 and not content_range.startswith(f"bytes {have}-")
+                if not restart:
+                    # 206 means the range was honoured, so append; a plain 200 resends the whole file
+                    with open(partpath, "ab" if response.status_code == 206 else "wb") as f:
+                        # Write in 64 KiB chunks instead of holding the whole PDF in memory
+                        for chunk in response.iter_content(1 << 16):
+                            f.write(chunk)
+        if restart:
+            # The server's answer does not line up with the .part, so fetch this paper from scratch
+            os.remove(partpath)
+            return download(i, link, filename, filepath)
+        os.replace(partpath, filepath)
+        print(f"Saved to {filepath}")
+    except Exception as e:
+        print(f"Failed to download {link}: {e}")
+
+
 # === Ask once ===
-choice = input(f"Download all {len(papers)} PDFs? (y/n): ").strip().lower()
+choice = "y" if args.yes else input(f"Download all {len(papers)} PDFs? (y/n): ").strip().lower()
 
 if choice == "y":
-    for i, (title, venue, link, affinity) in enumerate(papers, 1):
-        # Clean filename: remove illegal characters
-        safe_title = re.sub(r'[^a-zA-Z0-9_\- ]', '', title)
-        safe_venue = re.sub(r'[^a-zA-Z0-9_\- ]', '', venue)
-        affinity_str = f"{affinity:.2f}"  # round to 2 decimals
-
-        filename = f"{i:02d} - {affinity_str} - {safe_venue} - {safe_title}.pdf"
-        filepath = os.path.join(save_dir, filename)
-
-        try:
-            print(f"[{i}/{len(papers)}] Downloading {filename} ...")
-            response = requests.get(link)
-            response.raise_for_status()
-            with open(filepath, "wb") as f:
-                f.write(response.content)
-            print(f"Saved to {filepath}")
-        except Exception as e:
-            print(f"Failed to download {link}: {e}")
+    # Downloads are network-bound, so several run at once in worker threads
+    ex = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for job in jobs:
+            ex.submit(download, *job)
+        ex.shutdown(wait=True)
+    except KeyboardInterrupt:
+        # Ctrl-C: drop the queued papers; the ones in flight finish (or leave a .part to resume)
+        ex.shutdown(wait=False, cancel_futures=True)
+        raise
     print("\nAll downloads completed.")
 else:
     print("Download cancelled.")
+
+SESSION.close()
@@ -1,43 +1,101 @@
-import re
+import os
+import argparse
+import itertools
+import mmap
 from pathlib import Path
 
 DEFAULT_INPUT = "ai-paper-finder.info search results.txt"
 DEFAULT_OUTPUT = "references.bib"
 
 
+def _skip_space(buf, j):
+    """Return the index of the first non-whitespace character in UTF-8 `buf` at or after `j`.
+
+    Whitespace is decided by str.isspace(), as '\\s' did in the old str pattern, so NBSP,
+    U+2028 and '\\x1c'-'\\x1f' count too, not just ASCII whitespace.
+    """
+    while j < len(buf):
+        lead = buf[j]
+        width = 1 if lead < 0x80 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+        try:
+            ch = buf[j:j + width].decode("utf-8")
+        except UnicodeDecodeError:
+            return j
+        if not ch.isspace():
+            return j
+        j += width
+    return j
+
+
+def iter_bibtex(buf):
+    """Yield each BibTeX block that follows a 'BibTeX:' label, from its '@' through the first '\\n}'.
+
+    Plain find() scans in place of the lazy regex 'BibTeX:\\s*\\n(@[\\s\\S]*?\\n})', with the same matches.
+    Line endings are not translated the way read_text() did, so a lone '\\r' does not count as a line break.
+    """
+    i = buf.find(b"BibTeX:")
+    while i >= 0:
+        j = _skip_space(buf, i + len(b"BibTeX:"))
+        # Only whitespace may sit between the label and the '@', and the '@' must start a line
+        if buf[j:j + 1] == b"@" and buf[j - 1:j] == b"\n":
+            k = buf.find(b"\n}", j)
+            if k < 0:
+                return
+            yield buf[j:k + 2]
+            i = buf.find(b"BibTeX:", k + 2)
+        else:
+            i = buf.find(b"BibTeX:", i + 1)
+
+
 def extract_bibtex_entries(input_path, output_path):
-    text = Path(input_path).read_text(encoding="utf-8")
+    # Scan the UTF-8 bytes in place; the blocks are written back out as-is, so nothing needs decoding
+    with open(input_path, "rb") as f:
+        text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
 
-    bibtex_blocks = re.findall(
-        r"BibTeX:\s*\n(@[\s\S]*?\n})",
-        text,
-        flags=re.MULTILINE
-    )
+    blocks = iter_bibtex(text)
+    first = next(blocks, None)
 
-    if not bibtex_blocks:
+    if first is None:
         raise ValueError("No BibTeX entries found in the input file.")
 
-    clean_bibtex = "\n\n".join(block.strip() for block in bibtex_blocks)
+    # Write each block as it is matched, so only one block is held in memory at a time
+    count = 0
+    with open(output_path, "wb") as out:
+        for block in itertools.chain([first], blocks):
+            if count:
+                out.write(b"\n\n")
+            out.write(block.strip())
+            count += 1
+        out.write(b"\n")
 
-    Path(output_path).write_text(clean_bibtex + "\n", encoding="utf-8")
-
-    print(f"Extracted {len(bibtex_blocks)} BibTeX entries.")
+    print(f"Extracted {count} BibTeX entries.")
     print(f"Production-ready BibTeX written to: {output_path}")
 
 
 def main():
-    print(f"Default input file: '{DEFAULT_INPUT}'")
-    response = input("Is this the correct file? [Y/n]: ").strip().lower()
+    parser = argparse.ArgumentParser(description="Extract the BibTeX entries from exported search results.")
+    parser.add_argument("--input", default=None, help=f"Input file (default: '{DEFAULT_INPUT}')")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Output .bib file")
+    parser.add_argument("--yes", action="store_true", help="Use the default input file without asking")
+    args = parser.parse_args()
+
+    input_file = args.input
+    if input_file is None:
+        if args.yes:
+            input_file = DEFAULT_INPUT
+        else:
+            print(f"Default input file: '{DEFAULT_INPUT}'")
+            response = input("Is this the correct file? [Y/n]: ").strip().lower()
 
-    if response in ("", "y", "yes"):
-        input_file = DEFAULT_INPUT
-    else:
-        input_file = input("Please enter the input file path: ").strip()
+            if response in ("", "y", "yes"):
+                input_file = DEFAULT_INPUT
+            else:
+                input_file = input("Please enter the input file path: ").strip()
 
     if not Path(input_file).exists():
         raise FileNotFoundError(f"File not found: {input_file}")
 
-    extract_bibtex_entries(input_file, DEFAULT_OUTPUT)
+    extract_bibtex_entries(input_file, args.output)
 
 
 if __name__ == "__main__":